@@ -6,16 +6,79 @@ This script processes VitePress-generated HTML documentation files and converts
 them to clean, readable Markdown suitable for AI agents.
 
 Usage:
-    python convert_html_to_markdown.py [--input-dir PATH] [--output-dir PATH]
+    python convert_html_to_markdown.py [--input-dir PATH] [--output-dir PATH | --output-archive PATH]
 """
 
+import io
 import os
 import re
-import html
+import codecs
+import json
+import time
+import hashlib
+import tarfile
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
+import lxml.html
+from lxml import etree
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    # The progress bar is optional
+    tqdm = None
+
+
+# Bump whenever the conversion output changes, to invalidate cached results
+CONVERTER_VERSION = '6'
+
+# Content hashes from the previous run, stored in the output directory
+CACHE_FILENAME = '.cache.json'
+
+# Chunk size used when hashing input files
+_READ_CHUNK_SIZE = 64 * 1024
+
+# libxml2-backed parser shared by every conversion
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8', remove_comments=True)
+
+# VitePress custom block classes and their Markdown labels
+_CUSTOM_BLOCK_TYPES = {
+    'warning': 'WARNING',
+    'danger': 'DANGER',
+    'tip': 'TIP',
+    'info': 'INFO',
+}
+
+# Markdown markers for inline text formatting
+_EMPHASIS_MARKERS = {
+    'strong': '**',
+    'b': '**',
+    'em': '*',
+    'i': '*',
+    'del': '~~',
+    's': '~~',
+}
+
+# List item children rendered on their own lines instead of inline
+_LIST_ITEM_BLOCK_TAGS = {'p', 'div', 'pre', 'table', 'ul', 'ol'}
+
+# Invisible characters left over from the rendered HTML (zero-width
+# spaces in header anchors, stray byte order marks)
+_ARTIFACT_DELETIONS = str.maketrans('', '', '\u200b\ufeff')
+
+# Patterns used on every file, compiled once at import
+_RE_API_REFERENCE = re.compile(r'^api reference ', re.IGNORECASE)
+_RE_LIST_ITEM = re.compile(r' *(?:-|\d+\.)(?: |$)')
+
+
+def _text_content(node) -> str:
+    """Return all text inside an element, without its tail."""
+    return ''.join(node.itertext())
+
 
 class HtmlToMarkdownConverter:
     """Converts QuestPDF HTML documentation to Markdown format."""
@@ -25,439 +88,344 @@ class HtmlToMarkdownConverter:
 
     def convert_file(self, html_content: str, filename: str) -> str:
         """Convert a single HTML file to Markdown."""
+        # Parse as bytes: lxml refuses str input that carries an XML
+        # encoding declaration
+        try:
+            root = lxml.html.fromstring(html_content.encode('utf-8'), parser=_HTML_PARSER)
+            node = self._find_main_content(root)
+        except etree.ParserError:
+            # Empty document (or one holding nothing but comments)
+            node = None
+        
+        return self.convert_element(node, filename)
+
+    def convert_element(self, node, filename: str) -> str:
+        """Convert an already parsed content element to Markdown."""
         self.current_file = filename
         
-        # Extract the main content
-        content = self._extract_main_content(html_content)
-        
-        # Process in order (order matters for nested elements)
-        content = self._remove_hidden_elements(content)
-        content = self._convert_code_blocks(content)
-        content = self._convert_inline_code(content)
-        content = self._convert_headers(content)
-        content = self._convert_custom_blocks(content)
-        content = self._convert_tables(content)
-        content = self._convert_images(content)
-        content = self._convert_links(content)
-        content = self._convert_lists(content)
-        content = self._convert_paragraphs(content)
-        content = self._convert_text_formatting(content)
-        content = self._clean_html_entities(content)
+        # Walk the content tree once; anything after the root's closing tag
+        # (its tail) is outside the content and is left out
+        out = []
+        if node is not None:
+            self._render_element(node, out)
+        
+        content = self._remove_artifacts(''.join(out))
         content = self._cleanup_whitespace(content)
         
         # Add title from filename
         title = self._generate_title(filename)
         return f"# {title}\n\n{content}"
 
-    def _extract_main_content(self, html_content: str) -> str:
-        """Extract the main documentation content from the HTML."""
-        # Try to find the main content div
-        main_match = re.search(r'<main[^>]*>(.*?)</main>', html_content, re.DOTALL)
-        if main_match:
-            return main_match.group(1)
-        
-        # Fallback to body content
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', html_content, re.DOTALL)
-        if body_match:
-            return body_match.group(1)
-        
-        return html_content
-
-    def _remove_hidden_elements(self, content: str) -> str:
-        """Remove hidden elements (like LLM hints that are already hidden)."""
-        # Remove divs with aria-hidden="true" or hidden="true"
-        content = re.sub(
-            r'<div[^>]*(?:aria-hidden="true"|hidden="true")[^>]*>.*?</div>',
-            '',
-            content,
-            flags=re.DOTALL | re.IGNORECASE
-        )
-        # Remove copy buttons
-        content = re.sub(r'<button[^>]*class="copy"[^>]*>.*?</button>', '', content, flags=re.DOTALL)
-        # Remove header anchor links
-        content = re.sub(r'<a[^>]*class="header-anchor"[^>]*>.*?</a>', '', content, flags=re.DOTALL)
-        return content
-
-    def _convert_code_blocks(self, content: str) -> str:
-        """Convert syntax-highlighted code blocks to markdown code blocks."""
-        
-        def extract_text_from_spans(html_content: str) -> str:
-            """Recursively extract text from nested span elements."""
-            # This handles the Shiki syntax highlighter's nested span structure
-            # where code is split into spans with style attributes
-            
-            result = []
-            # Use a simple state machine to extract text between tags
-            i = 0
-            while i < len(html_content):
-                if html_content[i] == '<':
-                    # Find the end of the tag
-                    end = html_content.find('>', i)
-                    if end == -1:
-                        break
-                    i = end + 1
-                else:
-                    # Find the start of the next tag or end of string
-                    next_tag = html_content.find('<', i)
-                    if next_tag == -1:
-                        result.append(html_content[i:])
-                        break
-                    else:
-                        result.append(html_content[i:next_tag])
-                        i = next_tag
-            
-            return ''.join(result)
-        
-        def extract_code_from_pre(match):
-            """Extract plain text code from a pre/code block with syntax highlighting."""
-            full_block = match.group(0)
-            
-            # Get language from the outer div or span
-            lang_match = re.search(r'class="language-([^"\s]+)', full_block)
-            language = lang_match.group(1) if lang_match else ''
-            
-            # Also try to find language from span.lang
-            if not language:
-                span_lang = re.search(r'<span class="lang">([^<]+)</span>', full_block)
-                if span_lang:
-                    language = span_lang.group(1)
-            
-            # Find the code element
-            code_match = re.search(r'<code[^>]*>(.*?)</code>', full_block, re.DOTALL)
-            if not code_match:
-                return full_block
-            
-            code_content = code_match.group(1)
-            
-            # Extract text from span.line elements (handles highlighted lines too)
-            # Match both 'class="line"' and 'class="line highlighted"' etc.
-            lines = re.findall(r'<span class="line[^"]*"[^>]*>(.*?)</span>(?=\s*<span class="line|$)', 
-                             code_content, re.DOTALL)
-            
-            if lines:
-                clean_lines = []
-                for line in lines:
-                    # Extract all text from nested spans
-                    clean_line = extract_text_from_spans(line)
-                    clean_line = html.unescape(clean_line)
-                    clean_lines.append(clean_line)
-                code_text = '\n'.join(clean_lines)
+    def _find_main_content(self, root):
+        """Find the main documentation content element."""
+        # Try to find the main content element
+        for tag in ('main', 'body'):
+            node = next(root.iter(tag), None)
+            if node is not None:
+                return node
+        
+        return root
+
+    def _walk(self, node, out: list) -> None:
+        """Render an element and its tail as Markdown into the output buffer."""
+        self._render_element(node, out)
+        if node.tail:
+            out.append(node.tail)
+
+    def _render_element(self, node, out: list) -> None:
+        """Render an element, excluding its tail, into the output buffer."""
+        # Comments and processing instructions carry no content
+        if isinstance(node.tag, str) and not self._is_hidden(node):
+            handler = self._TAG_HANDLERS.get(node.tag)
+            markdown = handler(self, node) if handler else None
+            if markdown is None:
+                self._walk_children(node, out)
             else:
-                # Alternative approach: find all line spans differently
-                # Split by line span opening tags
-                line_parts = re.split(r'<span class="line[^"]*"[^>]*>', code_content)
-                if len(line_parts) > 1:
-                    clean_lines = []
-                    for part in line_parts[1:]:  # Skip first empty part
-                        # Take content up to closing span
-                        end_idx = part.rfind('</span>')
-                        if end_idx > 0:
-                            line_content = part[:end_idx]
-                        else:
-                            line_content = part
-                        clean_line = extract_text_from_spans(line_content)
-                        clean_line = html.unescape(clean_line)
-                        clean_lines.append(clean_line)
-                    code_text = '\n'.join(clean_lines)
+                out.append(markdown)
+
+    def _walk_children(self, node, out: list) -> None:
+        """Render the text and children of an element, excluding its tail."""
+        if node.text:
+            out.append(node.text)
+        for child in node.iterchildren():
+            self._walk(child, out)
+
+    def _render_inline(self, node) -> str:
+        """Render the contents of an element to a stripped Markdown string."""
+        out = []
+        self._walk_children(node, out)
+        return ''.join(out).strip()
+
+    def _render_single_line(self, node) -> str:
+        """Render the contents of an element with all whitespace collapsed."""
+        return ' '.join(self._render_inline(node).split())
+
+    def _is_hidden(self, node) -> bool:
+        """Check for hidden elements (like LLM hints), copy buttons and header anchors."""
+        tag = node.tag
+        classes = node.get('class', '').split()
+        
+        if tag == 'div':
+            return node.get('aria-hidden') == 'true' or node.get('hidden') == 'true'
+        if tag == 'button':
+            return 'copy' in classes
+        if tag == 'a':
+            return 'header-anchor' in classes
+        return False
+
+    def _convert_div(self, node) -> Optional[str]:
+        """Convert VitePress code block and custom block containers."""
+        classes = node.get('class', '').split()
+        if classes and classes[0].startswith('language-'):
+            return self._convert_code_block(node)
+        if 'custom-block' in classes:
+            return self._convert_custom_block(node)
+        
+        # Plain wrapper div, render its children in place
+        return None
+
+    def _convert_inline_code(self, node) -> str:
+        """Convert an inline code element to markdown."""
+        return f"`{_text_content(node)}`"
+
+    def _convert_emphasis(self, node) -> str:
+        """Convert bold, italic and strikethrough elements to markdown."""
+        text = self._render_inline(node)
+        if not text:
+            # Empty elements such as icon <i> tags would leave bare markers
+            return ''
+        
+        marker = _EMPHASIS_MARKERS[node.tag]
+        return f"{marker}{text}{marker}"
+
+    def _convert_line_break(self, node) -> str:
+        """Convert a line break to a newline."""
+        return '\n'
+
+    def _skip(self, node) -> str:
+        """Drop an element that carries no documentation content."""
+        return ''
+
+    def _convert_header(self, node) -> str:
+        """Convert an HTML header to a markdown header."""
+        level = int(node.tag[1])
+        # Skip h1 as we'll add our own title
+        if level == 1:
+            return ''
+        
+        header_text = self._render_single_line(node)
+        if not header_text:
+            return ''
+        
+        return f"\n{'#' * level} {header_text}\n"
+
+    def _convert_paragraph(self, node) -> str:
+        """Convert a paragraph to text with proper spacing."""
+        text = self._render_inline(node)
+        if text:
+            return f"\n{text}\n"
+        return ''
+
+    def _convert_code_block(self, node) -> str:
+        """Convert a syntax-highlighted code block to a markdown code block."""
+        # Get language from the outer div or span.lang
+        language = ''
+        for cls in node.get('class', '').split():
+            if cls.startswith('language-'):
+                language = cls[len('language-'):]
+                break
+        
+        # span.lang is a direct child of the container; look only there rather
+        # than descending through every highlighted token span in the block
+        if not language:
+            for span_lang in node.iterchildren('span'):
+                if span_lang.get('class') == 'lang' and span_lang.text:
+                    language = span_lang.text
+                    break
+        
+        # Find the code element
+        code = node if node.tag == 'code' else next(node.iter('code'), None)
+        if code is None:
+            return ''
+        
+        # Extract text from span.line elements (handles highlighted lines too);
+        # The parser has already decoded entities inside the nested Shiki spans
+        lines = [
+            _text_content(child)
+            for child in code.iterchildren('span')
+            if child.get('class', '').startswith('line')
+        ]
+        code_text = '\n'.join(lines) if lines else _text_content(code)
+        
+        return f"\n```{language}\n{code_text.strip()}\n```\n"
+
+    def _convert_custom_block(self, node) -> str:
+        """Convert a VitePress custom block (warning, info, tip, etc.) to markdown."""
+        # Determine block type from the class token next to "custom-block"
+        block_type = 'NOTE'
+        for cls in node.get('class', '').lower().split():
+            if cls in _CUSTOM_BLOCK_TYPES:
+                block_type = _CUSTOM_BLOCK_TYPES[cls]
+                break
+        
+        # Join paragraph content, skipping the title paragraph
+        paragraphs = [
+            self._render_inline(p)
+            for p in node.iter('p')
+            if 'custom-block-title' not in p.get('class', '').split()
+        ]
+        text_content = ' '.join(paragraphs).strip()
+        
+        return f"\n> **{block_type}:** {text_content}\n"
+
+    def _convert_table(self, node) -> str:
+        """Convert an HTML table to a markdown table."""
+        # Extract headers; cells are collapsed onto one line so line breaks
+        # inside them cannot split a markdown table row
+        headers = []
+        thead = node.find('thead')
+        if thead is not None:
+            headers = [self._render_single_line(th) for th in thead.iter('th')]
+        
+        # Extract rows
+        rows = []
+        for tr in node.iter('tr'):
+            cells = [self._render_single_line(td) for td in tr.iterchildren('td')]
+            if cells:
+                rows.append(cells)
+        
+        if not headers and not rows:
+            return ''
+        
+        # Build markdown table
+        md_lines = []
+        
+        if headers:
+            md_lines.append('| ' + ' | '.join(headers) + ' |')
+            md_lines.append('| ' + ' | '.join(['---'] * len(headers)) + ' |')
+        
+        for row in rows:
+            # Pad short rows to the header width in one step
+            padded = row + [''] * (len(headers) - len(row))
+            md_lines.append('| ' + ' | '.join(padded) + ' |')
+        
+        return '\n' + '\n'.join(md_lines) + '\n'
+
+    def _convert_list(self, node, indent: str = '') -> str:
+        """Convert an HTML list to a markdown list, indenting nested lists."""
+        md_items = []
+        for i, item in enumerate(node.iterchildren('li'), 1):
+            marker = f"{i}." if node.tag == 'ol' else '-'
+            # Continuation lines line up with the text after the marker
+            continuation = indent + ' ' * (len(marker) + 1)
+            
+            # Inline content is joined onto one line, while block children
+            # (paragraphs, code blocks, nested lists) keep their own lines;
+            # segments are (kind, markdown) with kind 'text', 'block' or 'list'
+            segments = []
+            out = []
+            if item.text:
+                out.append(item.text)
+            for child in item.iterchildren():
+                if child.tag not in _LIST_ITEM_BLOCK_TAGS:
+                    self._walk(child, out)
+                    continue
+                
+                segments.append(('text', ' '.join(''.join(out).split())))
+                out = [child.tail] if child.tail else []
+                if child.tag in ('ul', 'ol'):
+                    segments.append(('list', self._convert_list(child, continuation).strip('\n')))
+                elif child.tag == 'p':
+                    segments.append(('text', self._render_single_line(child)))
+                elif child.tag == 'div' and not self._is_hidden(child):
+                    markdown = self._convert_div(child)
+                    if markdown is None:
+                        # Plain wrapper div, its text belongs to the item
+                        segments.append(('text', self._render_single_line(child)))
+                    else:
+                        segments.append(('block', markdown.strip('\n')))
                 else:
-                    # Fallback: just strip all tags
-                    code_text = re.sub(r'<[^>]+>', '', code_content)
-                    code_text = html.unescape(code_text)
-            
-            return f"\n```{language}\n{code_text.strip()}\n```\n"
-        
-        # Match the entire code block container
-        content = re.sub(
-            r'<div class="language-[^"]*[^>]*>.*?<pre[^>]*>.*?</pre>\s*</div>',
-            extract_code_from_pre,
-            content,
-            flags=re.DOTALL
-        )
-        
-        # Also handle standalone pre/code blocks
-        content = re.sub(
-            r'<pre[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
-            lambda m: f"\n```\n{html.unescape(re.sub(r'<[^>]+>', '', m.group(1)))}\n```\n",
-            content,
-            flags=re.DOTALL
-        )
-        
-        return content
-
-    def _convert_inline_code(self, content: str) -> str:
-        """Convert inline code elements to markdown."""
-        def convert_code(match):
-            code_text = match.group(1)
-            code_text = re.sub(r'<[^>]+>', '', code_text)
-            code_text = html.unescape(code_text)
-            return f"`{code_text}`"
-        
-        content = re.sub(r'<code[^>]*>(.*?)</code>', convert_code, content, flags=re.DOTALL)
-        return content
-
-    def _convert_headers(self, content: str) -> str:
-        """Convert HTML headers to markdown headers."""
-        def convert_header(match):
-            level = int(match.group(1))
-            # Skip h1 as we'll add our own title
-            if level == 1:
-                return ''
-            
-            header_content = match.group(2)
-            # Clean up the header content
-            header_text = re.sub(r'<[^>]+>', '', header_content)
-            header_text = html.unescape(header_text).strip()
-            # Remove the anchor symbol (​)
-            header_text = header_text.replace('​', '').strip()
-            
-            if not header_text:
-                return ''
-            
-            return f"\n{'#' * level} {header_text}\n"
-        
-        content = re.sub(
-            r'<h([1-6])[^>]*>(.*?)</h\1>',
-            convert_header,
-            content,
-            flags=re.DOTALL
-        )
-        return content
-
-    def _convert_custom_blocks(self, content: str) -> str:
-        """Convert VitePress custom blocks (warning, info, tip, etc.) to markdown."""
-        def convert_block(match):
-            full_block = match.group(0)
-            
-            # Determine block type
-            if 'warning' in full_block.lower():
-                block_type = 'WARNING'
-            elif 'danger' in full_block.lower():
-                block_type = 'DANGER'
-            elif 'tip' in full_block.lower():
-                block_type = 'TIP'
-            elif 'info' in full_block.lower():
-                block_type = 'INFO'
+                    block = []
+                    self._render_element(child, block)
+                    segments.append(('block', ''.join(block).strip('\n')))
+            segments.append(('text', ' '.join(''.join(out).split())))
+            
+            # Leading text becomes the item line; everything else follows below
+            # it, indented so it stays inside the item
+            segments = [(kind, markdown) for kind, markdown in segments if markdown]
+            if segments and segments[0][0] == 'text':
+                md_items.append(f"{indent}{marker} {segments.pop(0)[1]}")
             else:
-                block_type = 'NOTE'
-            
-            # Extract content (after the title)
-            # Remove the title paragraph
-            block_content = re.sub(r'<p[^>]*class="custom-block-title"[^>]*>.*?</p>', '', full_block, flags=re.DOTALL)
-            # Extract remaining paragraph content
-            paragraphs = re.findall(r'<p[^>]*>(.*?)</p>', block_content, re.DOTALL)
-            text_content = ' '.join(paragraphs)
-            
-            # Convert links within the block before stripping other tags
-            def convert_inner_link(link_match):
-                href = re.search(r'href="([^"]+)"', link_match.group(0))
-                link_text = re.sub(r'<[^>]+>', '', link_match.group(1))
-                if href:
-                    return f"[{link_text}]({href.group(1)})"
-                return link_text
-            
-            text_content = re.sub(r'<a[^>]*>(.*?)</a>', convert_inner_link, text_content, flags=re.DOTALL)
-            
-            # Now strip remaining tags
-            text_content = re.sub(r'<[^>]+>', '', text_content)
-            text_content = html.unescape(text_content).strip()
-            
-            return f"\n> **{block_type}:** {text_content}\n"
-        
-        content = re.sub(
-            r'<div class="[^"]*custom-block[^"]*"[^>]*>.*?</div>',
-            convert_block,
-            content,
-            flags=re.DOTALL
-        )
-        return content
-
-    def _convert_tables(self, content: str) -> str:
-        """Convert HTML tables to markdown tables."""
-        def convert_table(match):
-            table_html = match.group(0)
-            
-            # Extract headers
-            headers = []
-            header_match = re.search(r'<thead>(.*?)</thead>', table_html, re.DOTALL)
-            if header_match:
-                header_cells = re.findall(r'<th[^>]*>(.*?)</th>', header_match.group(1), re.DOTALL)
-                headers = [html.unescape(re.sub(r'<[^>]+>', '', h)).strip() for h in header_cells]
+                md_items.append(f"{indent}{marker}")
             
-            # Extract rows
-            rows = []
-            body_match = re.search(r'<tbody>(.*?)</tbody>', table_html, re.DOTALL)
-            if body_match:
-                row_matches = re.findall(r'<tr[^>]*>(.*?)</tr>', body_match.group(1), re.DOTALL)
-                for row in row_matches:
-                    cells = re.findall(r'<td[^>]*>(.*?)</td>', row, re.DOTALL)
-                    rows.append([html.unescape(re.sub(r'<[^>]+>', '', c)).strip() for c in cells])
-            
-            if not headers and not rows:
-                return ''
-            
-            # Build markdown table
-            md_lines = []
-            
-            if headers:
-                md_lines.append('| ' + ' | '.join(headers) + ' |')
-                md_lines.append('| ' + ' | '.join(['---'] * len(headers)) + ' |')
-            
-            for row in rows:
-                # Pad row if needed
-                while len(row) < len(headers):
-                    row.append('')
-                md_lines.append('| ' + ' | '.join(row) + ' |')
-            
-            return '\n' + '\n'.join(md_lines) + '\n'
+            for kind, markdown in segments:
+                if kind == 'list':
+                    md_items.append(markdown)
+                else:
+                    md_items.extend(
+                        continuation + line if line else line
+                        for line in markdown.split('\n')
+                    )
         
-        content = re.sub(r'<table[^>]*>.*?</table>', convert_table, content, flags=re.DOTALL)
-        return content
+        return '\n' + '\n'.join(md_items) + '\n'
 
-    def _convert_images(self, content: str) -> str:
-        """Convert image tags to markdown image syntax."""
-        def convert_image(match):
-            img_tag = match.group(0)
-            
-            # Extract src
-            src_match = re.search(r'src="([^"]+)"', img_tag)
-            src = src_match.group(1) if src_match else ''
-            
-            # Extract alt
-            alt_match = re.search(r'alt="([^"]*)"', img_tag)
-            alt = alt_match.group(1) if alt_match else 'image'
-            
-            if not src:
-                return ''
-            
-            return f"\n![{alt}]({src})\n"
+    def _convert_image(self, node) -> str:
+        """Convert an image tag to markdown image syntax."""
+        src = node.get('src', '')
+        alt = node.get('alt', 'image')
         
-        content = re.sub(r'<img[^>]+/?>', convert_image, content, flags=re.IGNORECASE)
-        return content
-
-    def _convert_links(self, content: str) -> str:
-        """Convert anchor tags to markdown links."""
-        def convert_link(match):
-            full_tag = match.group(0)
-            link_text = match.group(2)
-            
-            # Extract href
-            href_match = re.search(r'href="([^"]+)"', full_tag)
-            href = href_match.group(1) if href_match else ''
-            
-            # Clean link text
-            link_text = re.sub(r'<[^>]+>', '', link_text)
-            link_text = html.unescape(link_text).strip()
-            
-            if not link_text or not href:
-                return link_text if link_text else ''
-            
-            # Skip anchor-only links
-            if href.startswith('#'):
-                return link_text
-            
-            return f"[{link_text}]({href})"
-        
-        content = re.sub(r'<a([^>]*)>(.*?)</a>', convert_link, content, flags=re.DOTALL)
-        return content
-
-    def _convert_lists(self, content: str) -> str:
-        """Convert HTML lists to markdown lists."""
-        # Convert unordered lists
-        def convert_ul(match):
-            list_content = match.group(1)
-            items = re.findall(r'<li[^>]*>(.*?)</li>', list_content, re.DOTALL)
-            md_items = []
-            for item in items:
-                item_text = re.sub(r'<[^>]+>', '', item)
-                item_text = html.unescape(item_text).strip()
-                md_items.append(f"- {item_text}")
-            return '\n' + '\n'.join(md_items) + '\n'
-        
-        content = re.sub(r'<ul[^>]*>(.*?)</ul>', convert_ul, content, flags=re.DOTALL)
-        
-        # Convert ordered lists
-        def convert_ol(match):
-            list_content = match.group(1)
-            items = re.findall(r'<li[^>]*>(.*?)</li>', list_content, re.DOTALL)
-            md_items = []
-            for i, item in enumerate(items, 1):
-                item_text = re.sub(r'<[^>]+>', '', item)
-                item_text = html.unescape(item_text).strip()
-                md_items.append(f"{i}. {item_text}")
-            return '\n' + '\n'.join(md_items) + '\n'
-        
-        content = re.sub(r'<ol[^>]*>(.*?)</ol>', convert_ol, content, flags=re.DOTALL)
-        return content
-
-    def _convert_paragraphs(self, content: str) -> str:
-        """Convert paragraph tags to text with proper spacing."""
-        def convert_p(match):
-            p_content = match.group(1)
-            # Don't process if already processed (contains markdown)
-            if '```' in p_content:
-                return p_content
-            
-            text = re.sub(r'<[^>]+>', '', p_content)
-            text = html.unescape(text).strip()
-            if text:
-                return f"\n{text}\n"
+        if not src:
             return ''
         
-        content = re.sub(r'<p[^>]*>(.*?)</p>', convert_p, content, flags=re.DOTALL)
-        return content
+        return f"\n![{alt}]({src})\n"
 
-    def _convert_text_formatting(self, content: str) -> str:
-        """Convert HTML text formatting to markdown."""
-        # Bold
-        content = re.sub(r'<strong>(.*?)</strong>', r'**\1**', content, flags=re.DOTALL)
-        content = re.sub(r'<b>(.*?)</b>', r'**\1**', content, flags=re.DOTALL)
+    def _convert_link(self, node) -> str:
+        """Convert an anchor tag to a markdown link."""
+        href = node.get('href', '')
+        link_text = self._render_inline(node)
         
-        # Italic
-        content = re.sub(r'<em>(.*?)</em>', r'*\1*', content, flags=re.DOTALL)
-        content = re.sub(r'<i>(.*?)</i>', r'*\1*', content, flags=re.DOTALL)
+        if not link_text or not href:
+            return link_text
         
-        # Strikethrough
-        content = re.sub(r'<del>(.*?)</del>', r'~~\1~~', content, flags=re.DOTALL)
-        content = re.sub(r'<s>(.*?)</s>', r'~~\1~~', content, flags=re.DOTALL)
+        # Skip anchor-only links
+        if href.startswith('#'):
+            return link_text
         
-        return content
+        return f"[{link_text}]({href})"
 
-    def _clean_html_entities(self, content: str) -> str:
-        """Clean up any remaining HTML entities."""
-        content = html.unescape(content)
-        # Remove common artifacts
-        content = content.replace('​', '')  # Zero-width space
-        content = content.replace('\u200b', '')  # Another zero-width space
-        return content
+    def _remove_artifacts(self, content: str) -> str:
+        """Remove common text artifacts left over from the rendered HTML."""
+        return content.translate(_ARTIFACT_DELETIONS)
 
     def _cleanup_whitespace(self, content: str) -> str:
         """Clean up excessive whitespace while preserving code blocks."""
-        # Split content by code blocks to preserve their formatting
-        parts = re.split(r'(```[\s\S]*?```)', content)
-        
-        cleaned_parts = []
-        for i, part in enumerate(parts):
-            if part.startswith('```'):
-                # This is a code block, preserve it
-                cleaned_parts.append(part)
-            else:
-                # Clean up whitespace in non-code parts
-                # Remove remaining HTML tags
-                part = re.sub(r'<[^>]+>', '', part)
-                # Normalize multiple newlines to max 2
-                part = re.sub(r'\n{3,}', '\n\n', part)
-                # Remove leading/trailing whitespace from lines
-                lines = [line.strip() for line in part.split('\n')]
-                part = '\n'.join(lines)
-                cleaned_parts.append(part)
-        
-        content = ''.join(cleaned_parts)
-        
-        # Final cleanup
-        content = re.sub(r'\n{3,}', '\n\n', content)
-        content = content.strip()
-        
-        return content
+        # Single pass over the lines: strip prose lines and collapse runs of
+        # blank lines, but copy lines inside code fences through untouched.
+        # Within a list (up to the next blank line) indentation is kept, as
+        # it places nested items and continuation blocks inside their item
+        lines = []
+        in_code = False
+        in_list = False
+        previous_blank = True  # Also drops leading blank lines
+        
+        for line in content.split('\n'):
+            stripped = line.strip()
+            if stripped.startswith('```'):
+                in_code = not in_code
+                lines.append(line.rstrip() if in_list else stripped)
+                previous_blank = False
+            elif in_code:
+                lines.append(line)
+            elif stripped and (in_list or _RE_LIST_ITEM.match(line)):
+                in_list = True
+                lines.append(line.rstrip())
+                previous_blank = False
+            elif stripped or not previous_blank:
+                in_list = False
+                lines.append(stripped)
+                previous_blank = not stripped
+        
+        return '\n'.join(lines).strip()
 
     def _generate_title(self, filename: str) -> str:
         """Generate a readable title from the filename."""
@@ -468,7 +436,7 @@ class HtmlToMarkdownConverter:
         name = name.replace('_', ' ').replace('-', ' ')
         
         # Handle common patterns
-        name = re.sub(r'^api reference ', 'API Reference: ', name, flags=re.IGNORECASE)
+        name = _RE_API_REFERENCE.sub('API Reference: ', name)
         
         # Title case
         words = name.split()
@@ -481,46 +449,211 @@ class HtmlToMarkdownConverter:
         
         return ' '.join(title_words)
 
+    # Element handlers keyed on tag; a handler returning None means the
+    # element is a plain wrapper whose children are rendered in place
+    _TAG_HANDLERS = {
+        'h1': _convert_header,
+        'h2': _convert_header,
+        'h3': _convert_header,
+        'h4': _convert_header,
+        'h5': _convert_header,
+        'h6': _convert_header,
+        'p': _convert_paragraph,
+        'div': _convert_div,
+        'pre': _convert_code_block,
+        'table': _convert_table,
+        'ul': _convert_list,
+        'ol': _convert_list,
+        'img': _convert_image,
+        'a': _convert_link,
+        'code': _convert_inline_code,
+        'strong': _convert_emphasis,
+        'b': _convert_emphasis,
+        'em': _convert_emphasis,
+        'i': _convert_emphasis,
+        'del': _convert_emphasis,
+        's': _convert_emphasis,
+        'br': _convert_line_break,
+        'script': _skip,
+        'style': _skip,
+        'template': _skip,
+    }
+
+
+def _hash_file(f) -> str:
+    """Hash a file's content together with CONVERTER_VERSION, reading in chunks.
+
+    The content is also checked to be UTF-8 along the way, since libxml2
+    would otherwise recover from invalid bytes by inserting U+FFFD and
+    silently mangle the output. Raises UnicodeDecodeError for such input.
+    """
+    digest = hashlib.blake2b()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in iter(partial(f.read, _READ_CHUNK_SIZE), b''):
+        decoder.decode(chunk)
+        digest.update(chunk)
+    decoder.decode(b'', final=True)
+    
+    digest.update(CONVERTER_VERSION.encode())
+    return digest.hexdigest()
+
+
+def _parse_main_content(f):
+    """Parse an HTML stream up to the end of its <main> element.
+
+    Returns None when the document has no <main> element.
+    """
+    events = etree.iterparse(
+        f,
+        events=('end',),
+        tag='main',
+        html=True,
+        encoding='utf-8',
+        remove_comments=True,
+    )
+    try:
+        for _, element in events:
+            return element
+    except etree.XMLSyntaxError:
+        # Raised for empty documents; let the caller fall back
+        pass
+    
+    return None
+
+
+def _load_cache(output_dir: Path) -> dict:
+    """Load the content hashes recorded by the previous conversion run."""
+    try:
+        return json.loads((output_dir / CACHE_FILENAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(output_dir: Path, cache: dict) -> None:
+    """Record the content hashes of the files converted in this run."""
+    cache_file = output_dir / CACHE_FILENAME
+    cache_file.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding='utf-8')
+
+
+def _convert_one(
+    html_file: Path,
+    cached_digest: Optional[str],
+    output_dir: Optional[Path],
+) -> tuple[str, Optional[str], Optional[bytes], Optional[str]]:
+    """Convert a single HTML file to Markdown.
+
+    The Markdown is written to output_dir, or returned as UTF-8 bytes when
+    output_dir is None so the caller can add it to an archive. Files whose
+    content hash matches cached_digest are not converted again.
+    Runs in a worker process, so errors are returned rather than printed.
+    """
+    try:
+        with open(html_file, 'rb') as f:
+            # Stream the file once to hash it, then again into the parser,
+            # so the whole page is never held in memory as bytes
+            digest = _hash_file(f)
+            if digest == cached_digest:
+                return html_file.name, None, None, digest
+            
+            converter = HtmlToMarkdownConverter()
+            
+            # Convert to Markdown, parsing only as far as the end of <main>
+            f.seek(0)
+            main = _parse_main_content(f)
+            if main is not None:
+                markdown_content = converter.convert_element(main, html_file.name)
+            else:
+                f.seek(0)
+                html_content = f.read().decode('utf-8')
+                markdown_content = converter.convert_file(html_content, html_file.name)
+        
+        if output_dir is None:
+            return html_file.name, None, markdown_content.encode('utf-8'), digest
+        
+        # Write Markdown file
+        output_file = output_dir / (html_file.stem + '.md')
+        output_file.write_text(markdown_content, encoding='utf-8')
+        
+        return html_file.name, None, None, digest
+        
+    except Exception as e:
+        return html_file.name, str(e), None, None
+
+
+def convert_directory(input_dir: str, output_dir: str, output_archive: Optional[str] = None) -> None:
+    """Convert all HTML files in a directory to Markdown.
 
-def convert_directory(input_dir: str, output_dir: str) -> None:
-    """Convert all HTML files in a directory to Markdown."""
+    When output_archive is given, the Markdown files are collected into a
+    single tar archive at that path instead of being written to output_dir.
+    Otherwise files unchanged since the last run into output_dir are skipped.
+    """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     
-    # Create output directory if it doesn't exist
-    output_path.mkdir(parents=True, exist_ok=True)
+    archive = None
+    cache = {}
+    if output_archive:
+        archive = tarfile.open(output_archive, 'w')
+    else:
+        # Create output directory if it doesn't exist
+        output_path.mkdir(parents=True, exist_ok=True)
+        cache = _load_cache(output_path)
     
-    converter = HtmlToMarkdownConverter()
-    
-    # Find all HTML files
-    html_files = list(input_path.glob('*.html'))
+    # Find all HTML files (scandir reuses the directory entry's cached type)
+    with os.scandir(input_path) as entries:
+        html_files = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith('.html') and entry.is_file()
+        ]
     
     print(f"Found {len(html_files)} HTML files to convert")
     
-    for html_file in html_files:
-        print(f"Converting: {html_file.name}")
-        
-        try:
-            # Read HTML content
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Convert to Markdown
-            markdown_content = converter.convert_file(html_content, html_file.name)
-            
-            # Write Markdown file
-            md_filename = html_file.stem + '.md'
-            output_file = output_path / md_filename
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            
-            print(f"  -> Created: {md_filename}")
-            
-        except Exception as e:
-            print(f"  Error converting {html_file.name}: {e}")
+    # Files are independent, so convert them across all cores; this process
+    # is the only archive writer, which keeps the tar stream sequential
+    worker = partial(_convert_one, output_dir=None if archive else output_path)
+    # Only trust a cached hash while its Markdown output still exists
+    cached_digests = [
+        cache.get(html_file.name) if (output_path / (html_file.stem + '.md')).exists() else None
+        for html_file in html_files
+    ]
+    new_cache = {}
+    errors = []
+    unchanged = 0
+    try:
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(worker, html_files, cached_digests, chunksize=4)
+            if tqdm is not None:
+                results = tqdm(results, total=len(html_files), unit='file')
+            
+            # map() yields results in submission order, matching cached_digests
+            for (name, error, data, digest), cached_digest in zip(results, cached_digests):
+                if error:
+                    errors.append(f"  Error converting {name}: {error}")
+                    continue
+                
+                new_cache[name] = digest
+                if archive is not None:
+                    info = tarfile.TarInfo(Path(name).stem + '.md')
+                    info.size = len(data)
+                    info.mtime = int(time.time())
+                    archive.addfile(info, io.BytesIO(data))
+                elif digest == cached_digest:
+                    unchanged += 1
+    finally:
+        if archive is not None:
+            archive.close()
     
-    print(f"\nConversion complete! Markdown files saved to: {output_path}")
+    if archive is None:
+        _save_cache(output_path, new_cache)
+    
+    converted = len(new_cache) - unchanged
+    print(f"Converted {converted}, unchanged {unchanged}, failed {len(errors)}")
+    if errors:
+        print('\n'.join(errors))
+    
+    destination = output_archive if archive else output_path
+    print(f"\nConversion complete! Markdown files saved to: {destination}")
 
 
 def main():
@@ -537,6 +670,10 @@ def main():
         default='../docs/questpdf-md',
         help='Output directory for Markdown files'
     )
+    parser.add_argument(
+        '--output-archive',
+        help='Write all Markdown files into a single tar archive instead of --output-dir'
+    )
     
     args = parser.parse_args()
     
@@ -544,16 +681,20 @@ def main():
     script_dir = Path(__file__).parent
     input_dir = (script_dir / args.input_dir).resolve()
     output_dir = (script_dir / args.output_dir).resolve()
+    output_archive = (script_dir / args.output_archive).resolve() if args.output_archive else None
     
     print(f"Input directory: {input_dir}")
-    print(f"Output directory: {output_dir}")
+    if output_archive:
+        print(f"Output archive: {output_archive}")
+    else:
+        print(f"Output directory: {output_dir}")
     print()
     
     if not input_dir.exists():
         print(f"Error: Input directory does not exist: {input_dir}")
         return 1
     
-    convert_directory(str(input_dir), str(output_dir))
+    convert_directory(str(input_dir), str(output_dir), str(output_archive) if output_archive else None)
     return 0
 
 
@@ -1,9 +1,27 @@
 import os
 import re
-import requests
+import asyncio
+import httpx
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 
+
+async def fetch(client, url):
+    """Fetch a single page and return its raw HTML bytes."""
+    # No pool timeout: requests queued behind the connection limit may wait
+    # as long as needed for a free connection
+    response = await client.get(url, timeout=httpx.Timeout(30, pool=None))
+    response.raise_for_status()
+    return response.content
+
+
+async def fetch_all(urls):
+    """Fetch all pages concurrently over a shared connection pool."""
+    limits = httpx.Limits(max_connections=16)
+    async with httpx.AsyncClient(limits=limits, follow_redirects=True) as client:
+        return await asyncio.gather(*(fetch(client, url) for url in urls), return_exceptions=True)
+
+
 # Read links from the file
 with open('links.html', 'r') as f:
     links = [line.strip().strip('"') for line in f.readlines() if line.strip()]
@@ -16,16 +34,18 @@ print(f"Found {len(questpdf_links)} QuestPDF links to download")
 # Create output directory if needed
 output_dir = os.path.dirname(os.path.abspath(__file__))
 
-for link in questpdf_links:
+# Fetch all pages up front, then process them in order
+pages = asyncio.run(fetch_all(questpdf_links))
+
+for link, page in zip(questpdf_links, pages):
     try:
-        print(f"Downloading: {link}")
+        if isinstance(page, Exception):
+            raise page
         
-        # Fetch the page
-        response = requests.get(link, timeout=30)
-        response.raise_for_status()
+        print(f"Downloaded: {link}")
         
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Parse HTML (lxml sniffs the encoding from the raw bytes)
+        soup = BeautifulSoup(page, 'lxml')
         
         # Extract the main tag
         main_tag = soup.find('main')